@@ -2,10 +2,14 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import pyarrow as pa
 from pymongo import MongoClient
+from bson import ObjectId
+from pymongoarrow.api import Schema, find_pandas_all
+from pymongoarrow.types import ObjectIdType
+from streamlit_autorefresh import st_autorefresh
 from datetime import datetime, timedelta
 import json
-import time
 
 # Page config
 st.set_page_config(
@@ -14,6 +18,24 @@ st.set_page_config(
     layout="wide"
 )
 
+# Arrow schemas double as projections: only these fields leave the server
+ERROR_SCHEMA = Schema({
+    'timestamp': pa.timestamp('ms'),
+    'level': pa.string(),
+    'service': pa.string(),
+    'message': pa.string()
+})
+
+RECENT_SCHEMA = Schema({
+    '_id': ObjectIdType(),
+    'timestamp': pa.timestamp('ms'),
+    'level': pa.string(),
+    'service': pa.string(),
+    'user_id': pa.string(),
+    'message': pa.string(),
+    'response_time': pa.int64()
+})
+
 # Load config
 @st.cache_resource
 def get_mongo_connection():
@@ -28,19 +50,135 @@ def get_mongo_connection():
     collection = db[mongo_config['collection']]
     return collection
 
-def get_logs_data(hours=1):
-    """Fetch logs from MongoDB"""
+@st.cache_data(ttl=30, show_spinner=False)
+def get_summary(hours=1):
+    """Total log count and average response time from one server-side $group"""
+    collection = get_mongo_connection()
+    start_time = datetime.now() - timedelta(hours=hours)
+    
+    pipeline = [
+        {'$match': {'timestamp': {'$gte': start_time}}},
+        {'$group': {
+            '_id': None,
+            'total': {'$sum': 1},
+            'avg_response': {'$avg': '$response_time'}
+        }}
+    ]
+    summary = next(collection.aggregate(pipeline), None)
+    if summary is None:
+        return {'total': 0, 'avg_response': None}
+    return {'total': summary['total'], 'avg_response': summary['avg_response']}
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_counts(field, hours=1):
+    """Count logs per value of `field` with a server-side aggregation"""
+    collection = get_mongo_connection()
+    start_time = datetime.now() - timedelta(hours=hours)
+    
+    pipeline = [
+        {'$match': {'timestamp': {'$gte': start_time}}},
+        {'$group': {'_id': f'${field}', 'count': {'$sum': 1}}},
+        {'$sort': {'count': -1}}
+    ]
+    counts = {doc['_id']: doc['count'] for doc in collection.aggregate(pipeline)}
+    return pd.Series(counts, dtype='int64', name='count')
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_errors(hours=1, limit=0):
+    """Fetch ERROR/CRITICAL logs using the {level, timestamp} index"""
     collection = get_mongo_connection()
     start_time = datetime.now() - timedelta(hours=hours)
     
-    logs = list(collection.find(
-        {'timestamp': {'$gte': start_time}},
-        {'_id': 0}
-    ).sort('timestamp', -1))
+    df = find_pandas_all(
+        collection,
+        {
+            'level': {'$in': ['ERROR', 'CRITICAL']},
+            'timestamp': {'$gte': start_time}
+        },
+        schema=ERROR_SCHEMA,
+        sort=[('timestamp', -1)],
+        limit=limit
+    )
+    # Low-cardinality columns: value_counts runs on integer codes
+    for col in ['level', 'service']:
+        df[col] = df[col].astype('category')
+    return df
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_recent(hours=1, limit=50, before=None):
+    """Fetch one page of the newest logs, optionally after the `(timestamp, _id)` cursor `before`"""
+    collection = get_mongo_connection()
+    start_time = datetime.now() - timedelta(hours=hours)
     
-    if logs:
-        return pd.DataFrame(logs)
-    return pd.DataFrame()
+    # Range cursor on (timestamp, _id) instead of skip(), so deep pages stay cheap.
+    # _id breaks ties between logs written in the same millisecond.
+    query = {'timestamp': {'$gte': start_time}}
+    if before is not None:
+        before_ts, before_id = before
+        query['$or'] = [
+            {'timestamp': {'$lt': before_ts}},
+            {'timestamp': before_ts, '_id': {'$lt': ObjectId(before_id)}}
+        ]
+    
+    return find_pandas_all(
+        collection,
+        query,
+        schema=RECENT_SCHEMA,
+        sort=[('timestamp', -1), ('_id', -1)],
+        limit=limit
+    )
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_response_histogram(hours=1, buckets=30):
+    """Response time distribution bucketed server-side with $bucketAuto"""
+    collection = get_mongo_connection()
+    start_time = datetime.now() - timedelta(hours=hours)
+    
+    pipeline = [
+        {'$match': {
+            'timestamp': {'$gte': start_time},
+            'response_time': {'$type': 'number'}
+        }},
+        {'$bucketAuto': {'groupBy': '$response_time', 'buckets': buckets}}
+    ]
+    rows = [
+        {
+            'range': f"{doc['_id']['min']}–{doc['_id']['max']}",
+            'count': doc['count']
+        }
+        for doc in collection.aggregate(pipeline)
+    ]
+    return pd.DataFrame(rows, columns=['range', 'count'])
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_log_timeline(hours=1, bucket_minutes=5):
+    """Log counts per time bucket, grouped server-side on $dateTrunc"""
+    collection = get_mongo_connection()
+    now = datetime.now()
+    
+    pipeline = [
+        # Upper bound too: one stray future timestamp would stretch the axis
+        {'$match': {'timestamp': {'$gte': now - timedelta(hours=hours), '$lte': now}}},
+        {'$group': {
+            '_id': {'$dateTrunc': {
+                'date': '$timestamp', 'unit': 'minute', 'binSize': bucket_minutes
+            }},
+            'count': {'$sum': 1}
+        }},
+        {'$sort': {'_id': 1}}
+    ]
+    counts = pd.Series(
+        {doc['_id']: doc['count'] for doc in collection.aggregate(pipeline)},
+        dtype='int64', name='count'
+    )
+    if counts.empty:
+        return pd.DataFrame(columns=['timestamp', 'count'])
+    
+    # Empty buckets don't come back from $group; fill them so the line drops to zero
+    counts.index = pd.to_datetime(counts.index)
+    full_range = pd.date_range(counts.index[0], counts.index[-1], freq=f'{bucket_minutes}min')
+    counts = counts.reindex(full_range, fill_value=0)
+    return counts.rename_axis('timestamp').reset_index()
 
 # Title
 st.title("📊 Real-Time Log Analysis Dashboard")
@@ -63,36 +201,34 @@ selected_hours = hours_map[time_range]
 # Auto-refresh
 auto_refresh = st.sidebar.checkbox("Auto Refresh (30s)", value=True)
 if auto_refresh:
-    time.sleep(30)
-    st.rerun()
+    # Client-side timer triggers the rerun; no server thread sleeps in between
+    st_autorefresh(interval=30 * 1000, key='poll')
 
 # Fetch data
-df = get_logs_data(hours=selected_hours)
+summary = get_summary(hours=selected_hours)
+level_counts = get_counts('level', hours=selected_hours)
+service_counts = get_counts('service', hours=selected_hours)
 
-if df.empty:
+if summary['total'] == 0:
     st.warning("No log data available. Make sure the log generator and ingestion scripts are running.")
     st.stop()
 
-# Convert timestamp to datetime if it's not already
-if not pd.api.types.is_datetime64_any_dtype(df['timestamp']):
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-
 # Key Metrics
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    st.metric("Total Logs", f"{len(df):,}")
+    st.metric("Total Logs", f"{summary['total']:,}")
 
 with col2:
-    error_count = len(df[df['level'].isin(['ERROR', 'CRITICAL'])])
+    error_count = int(level_counts.reindex(['ERROR', 'CRITICAL'], fill_value=0).sum())
     st.metric("Errors", error_count, delta=None)
 
 with col3:
-    avg_response = df['response_time'].mean()
-    st.metric("Avg Response Time", f"{avg_response:.0f}ms")
+    avg_response = summary['avg_response']
+    st.metric("Avg Response Time", f"{avg_response:.0f}ms" if avg_response is not None else "—")
 
 with col4:
-    services_count = df['service'].nunique()
+    services_count = len(service_counts)
     st.metric("Active Services", services_count)
 
 st.markdown("---")
@@ -102,7 +238,6 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("Log Levels Distribution")
-    level_counts = df['level'].value_counts()
     fig = px.pie(
         values=level_counts.values,
         names=level_counts.index,
@@ -112,7 +247,7 @@ with col1:
 
 with col2:
     st.subheader("Logs Over Time")
-    df_time = df.set_index('timestamp').resample('5min').size().reset_index(name='count')
+    df_time = get_log_timeline(hours=selected_hours, bucket_minutes=5)
     fig = px.line(df_time, x='timestamp', y='count', markers=True)
     fig.update_layout(xaxis_title="Time", yaxis_title="Log Count")
     st.plotly_chart(fig, use_container_width=True)
@@ -122,10 +257,10 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("Service Activity")
-    service_counts = df['service'].value_counts().head(10)
+    top_services = service_counts.head(10)
     fig = px.bar(
-        x=service_counts.values,
-        y=service_counts.index,
+        x=top_services.values,
+        y=top_services.index,
         orientation='h',
         labels={'x': 'Count', 'y': 'Service'}
     )
@@ -133,9 +268,10 @@ with col1:
 
 with col2:
     st.subheader("Response Time Distribution")
-    fig = px.histogram(
-        df, x='response_time', nbins=30,
-        labels={'response_time': 'Response Time (ms)'}
+    response_hist = get_response_histogram(hours=selected_hours, buckets=30)
+    fig = px.bar(
+        response_hist, x='range', y='count',
+        labels={'range': 'Response Time (ms)', 'count': 'Count'}
     )
     st.plotly_chart(fig, use_container_width=True)
 
@@ -143,7 +279,7 @@ with col2:
 st.markdown("---")
 st.subheader("🔴 Error Analysis")
 
-error_df = df[df['level'].isin(['ERROR', 'CRITICAL'])]
+error_df = get_errors(hours=selected_hours)
 if not error_df.empty:
     col1, col2 = st.columns(2)
     
@@ -162,8 +298,33 @@ else:
 # Recent Logs Table
 st.markdown("---")
 st.subheader("Recent Logs")
-recent_logs = df.head(50)[['timestamp', 'level', 'service', 'user_id', 'message', 'response_time']]
-st.dataframe(recent_logs, use_container_width=True, height=300)
+if 'recent_before' not in st.session_state:
+    st.session_state.recent_before = None
+
+page_size = 50
+recent_logs = get_recent(
+    hours=selected_hours,
+    limit=page_size,
+    before=st.session_state.recent_before
+)
+st.dataframe(recent_logs.drop(columns='_id'), use_container_width=True, height=300)
+
+col1, col2 = st.columns(2)
+
+with col1:
+    if st.button("⏮ Newest", disabled=st.session_state.recent_before is None):
+        st.session_state.recent_before = None
+        st.rerun()
+
+with col2:
+    if st.button("Next ▶", disabled=len(recent_logs) < page_size):
+        # Last row on this page becomes the upper bound of the next one
+        last_row = recent_logs.iloc[-1]
+        st.session_state.recent_before = (
+            last_row['timestamp'].to_pydatetime(),
+            str(ObjectId(last_row['_id']))
+        )
+        st.rerun()
 
 # Footer
 st.markdown("---")
@@ -1,6 +1,8 @@
 import json
 from pymongo import MongoClient
-import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pymongoarrow.api import Schema, find_arrow_all
 from datetime import datetime, timedelta
 
 # Load config
@@ -15,12 +17,25 @@ collection = db[mongo_config['collection']]
 
 # Get last 24 hours of data
 start_time = datetime.now() - timedelta(hours=24)
-logs = list(collection.find({'timestamp': {'$gte': start_time}}, {'_id': 0}))
+schema = Schema({
+    'timestamp': pa.timestamp('ms'),
+    'level': pa.string(),
+    'service': pa.string(),
+    'user_id': pa.string(),
+    'ip_address': pa.string(),
+    'response_time': pa.int64(),
+    'message': pa.string()
+})
+table = find_arrow_all(
+    collection,
+    {'timestamp': {'$gte': start_time}},
+    schema=schema,
+    batch_size=10_000
+)
 
-# Convert to DataFrame and export
-df = pd.DataFrame(logs)
-output_file = '../outputs/powerbi_export.csv'
-df.to_csv(output_file, index=False)
+# Export as Parquet straight from the Arrow table; Power BI reads it natively
+output_file = '../outputs/powerbi_export.parquet'
+pq.write_table(table, output_file, compression='snappy')
 
-print(f"Exported {len(df)} records to {output_file}")
-print("Import this file into Power BI Desktop")
\ No newline at end of file
+print(f"Exported {table.num_rows} records to {output_file}")
+print("Import this file into Power BI Desktop (Get Data > Parquet)")
\ No newline at end of file
@@ -1,15 +1,15 @@
-import random
 import time
 import json
 from datetime import datetime
-from faker import Faker
+import numpy as np
 import os
 
-fake = Faker()
-
 class LogGenerator:
-    def __init__(self, log_file_path):
+    def __init__(self, log_file_path, log_format='json'):
         self.log_file_path = log_file_path
+        self.log_format = log_format
+        # Seeded from OS entropy; shared by every batch draw
+        self._rng = np.random.default_rng()
         self.log_levels = ['INFO', 'WARNING', 'ERROR', 'DEBUG', 'CRITICAL']
         self.services = ['AuthService', 'PaymentService', 'UserService', 
                         'NotificationService', 'DatabaseService']
@@ -32,29 +32,56 @@ class LogGenerator:
         
     def generate_log_entry(self):
         """Generate a single log entry"""
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-        level = random.choices(
-            self.log_levels, 
-            weights=[60, 20, 10, 8, 2]  # INFO is most common
-        )[0]
-        service = random.choice(self.services)
-        user_id = f"USER_{random.randint(1000, 9999)}"
-        ip_address = fake.ipv4()
+        return self.generate_log_batch(1)[0]
+    
+    def generate_log_batch(self, num_logs):
+        """Generate a batch of log entries with vectorized random draws"""
+        levels = self._rng.choice(
+            self.log_levels, size=num_logs,
+            p=[0.6, 0.2, 0.1, 0.08, 0.02]  # INFO is most common
+        )
+        is_error = np.isin(levels, ['ERROR', 'CRITICAL'])
+        services = self._rng.choice(self.services, size=num_logs)
+        user_ids = self._rng.integers(1000, 10000, size=num_logs)
+        octets = self._rng.integers(0, 256, size=(num_logs, 4), dtype=np.uint8)
+        messages = np.where(
+            is_error,
+            self._rng.choice(self.error_messages, size=num_logs),
+            self._rng.choice(self.info_messages, size=num_logs)
+        )
+        response_times = np.where(
+            is_error,
+            self._rng.integers(2000, 5001, size=num_logs),
+            self._rng.integers(50, 501, size=num_logs)
+        )
         
-        if level in ['ERROR', 'CRITICAL']:
-            message = random.choice(self.error_messages)
-            response_time = random.randint(2000, 5000)
-        else:
-            message = random.choice(self.info_messages)
-            response_time = random.randint(50, 500)
+        return [
+            {
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3],
+                'level': level,
+                'service': service,
+                'user_id': f"USER_{user_id}",
+                'ip_address': f"{a}.{b}.{c}.{d}",
+                'response_time': response_time,
+                'message': message
+            }
+            for level, service, user_id, (a, b, c, d), response_time, message in zip(
+                levels.tolist(), services.tolist(), user_ids.tolist(),
+                octets.tolist(), response_times.tolist(), messages.tolist()
+            )
+        ]
+    
+    def format_log_entry(self, log_entry):
+        """Render a log entry as a line in the configured format"""
+        if self.log_format == 'json':
+            return json.dumps(log_entry)
         
-        log_entry = (
-            f"{timestamp} | {level:8} | {service:20} | "
-            f"UserID: {user_id} | IP: {ip_address:15} | "
-            f"ResponseTime: {response_time}ms | Message: {message}"
+        # Legacy pipe-delimited format
+        return (
+            f"{log_entry['timestamp']} | {log_entry['level']:8} | {log_entry['service']:20} | "
+            f"UserID: {log_entry['user_id']} | IP: {log_entry['ip_address']:15} | "
+            f"ResponseTime: {log_entry['response_time']}ms | Message: {log_entry['message']}"
         )
-        
-        return log_entry
     
     def generate_continuous_logs(self, interval=2):
         """Generate logs continuously"""
@@ -65,11 +92,13 @@ class LogGenerator:
             with open(self.log_file_path, 'a', encoding='utf-8') as f:
                 while True:
                     # Generate 5-15 logs per batch
-                    num_logs = random.randint(5, 15)
-                    for _ in range(num_logs):
-                        log_entry = self.generate_log_entry()
-                        f.write(log_entry + '\n')
-                        print(log_entry)
+                    num_logs = int(self._rng.integers(5, 16))
+                    log_lines = [
+                        self.format_log_entry(log_entry)
+                        for log_entry in self.generate_log_batch(num_logs)
+                    ]
+                    f.write('\n'.join(log_lines) + '\n')
+                    print('\n'.join(log_lines))
                     
                     f.flush()  # Ensure logs are written immediately
                     time.sleep(interval)
@@ -92,7 +121,10 @@ if __name__ == "__main__":
     # Ensure log directory exists
     os.makedirs(log_dir, exist_ok=True)
     
-    generator = LogGenerator(log_path)
+    generator = LogGenerator(
+        log_path,
+        log_format=config['log_settings'].get('log_format', 'json')
+    )
     generator.generate_continuous_logs(
         interval=config['log_settings']['generation_interval']
     )
\ No newline at end of file
@@ -1,13 +1,40 @@
-import time
 import re
 import json
+import hashlib
 from datetime import datetime
+import pandas as pd
+from bson import ObjectId
 from pymongo import MongoClient
+from pymongo.errors import BulkWriteError
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import os
 
 class LogIngestion:
+    _LOG_FIELDS = ['timestamp', 'level', 'service', 'user_id',
+                   'ip_address', 'response_time', 'message']
+    
+    # Keeps each insert_many call comfortably under the 16 MB wire limit
+    INSERT_CHUNK_SIZE = 10_000
+    
+    # Legacy pipe-delimited format; compiled once and shared by every parse call.
+    # Bytes pattern, anchored per line, so a whole read buffer can be scanned at once
+    _LOG_RE = re.compile(
+        rb'(?m)^(?P<timestamp>[\d\-\: \.]+) \| '
+        rb'(?P<level>\w+)\s+\| '
+        rb'(?P<service>[\w]+)\s+\| '
+        rb'UserID: (?P<user_id>[\w_]+) \| '
+        rb'IP: (?P<ip_address>[\d\.]+)\s+\| '
+        rb'ResponseTime: (?P<response_time>\d+)ms \| '
+        rb'Message: (?P<message>[^\r\n]+)'
+    )
+    
+    # Structured format: one JSON object per line
+    _JSON_LINE_RE = re.compile(rb'(?m)^[ \t]*(\{[^\r\n]*)')
+    
+    # Any line with visible content; used to count lines neither format could parse
+    _NONBLANK_LINE_RE = re.compile(rb'(?m)^[ \t\r]*[^\s]')
+
     def __init__(self, config):
         self.config = config
         mongo_config = config['mongodb']
@@ -20,88 +47,277 @@ class LogIngestion:
         self.collection = self.db[mongo_config['collection']]
         
         # Create indexes for better query performance
-        self.collection.create_index([('timestamp', -1)])
-        self.collection.create_index([('level', 1)])
+        # TTL index: MongoDB deletes logs older than the retention window in the
+        # background, which keeps the working set small. It also serves time-range queries.
+        retention_days = mongo_config.get('retention_days', 7)
+        indexes = self.collection.index_information()
+        # Superseded by the TTL index and the {level, timestamp} index below
+        for name in ('timestamp_-1', 'level_1'):
+            if name in indexes:
+                self.collection.drop_index(name)
+        expire_after = retention_days * 24 * 3600
+        ttl_index = indexes.get('timestamp_1')
+        if ttl_index is None:
+            self.collection.create_index(
+                [('timestamp', 1)],
+                expireAfterSeconds=expire_after
+            )
+        elif ttl_index.get('expireAfterSeconds') != expire_after:
+            # Retention changed (or the index predates TTL); create_index would
+            # raise IndexOptionsConflict, so update the existing index in place
+            self.db.command(
+                'collMod', self.collection.name,
+                index={'keyPattern': {'timestamp': 1}, 'expireAfterSeconds': expire_after}
+            )
+        # Serves level filters on their own and level + time-range lookups
+        self.collection.create_index([('level', 1), ('timestamp', -1)])
         self.collection.create_index([('service', 1)])
         
         self.log_file_path = os.path.join(
             config['log_settings']['log_directory'],
             config['log_settings']['log_file']
         )
-        self.last_position = 0
         
-    def parse_log_line(self, line):
-        """Parse a log line into structured data"""
-        pattern = (
-            r'(?P<timestamp>[\d\-\: \.]+) \| '
-            r'(?P<level>\w+)\s+\| '
-            r'(?P<service>[\w]+)\s+\| '
-            r'UserID: (?P<user_id>[\w_]+) \| '
-            r'IP: (?P<ip_address>[\d\.]+)\s+\| '
-            r'ResponseTime: (?P<response_time>\d+)ms \| '
-            r'Message: (?P<message>.+)'
+        # Resume from the offset saved by a previous run instead of re-reading the file
+        self.offset_file_path = self.log_file_path + '.offset'
+        self.last_position, self._saved_identity = self._load_position()
+        self._identity = None
+        self._fh = None
+        
+    @staticmethod
+    def _line_key(offset, line):
+        """8-byte digest identifying a log line by its file offset and content"""
+        return hashlib.blake2b(offset.to_bytes(8, 'big') + line, digest_size=8).digest()
+    
+    def parse_log_batch(self, data, base_offset=0):
+        """Parse a raw (bytes) block of log lines into a DataFrame in one vectorized pass"""
+        # Format is detected per line, so files with older pipe-format lines still ingest
+        records, json_keys = [], []
+        for match in self._JSON_LINE_RE.finditer(data):
+            try:
+                record = json.loads(match.group(1))
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict):
+                records.append(record)
+                json_keys.append(self._line_key(base_offset + match.start(), match.group(1)))
+        json_df = pd.DataFrame(records, columns=self._LOG_FIELDS)
+        json_df['_line_key'] = json_keys
+        # JSON producers may write any ISO-8601 timestamp; offsets are normalized to UTC
+        json_df['timestamp'] = pd.to_datetime(
+            json_df['timestamp'], format='ISO8601', errors='coerce', utc=True
+        ).dt.tz_localize(None)
+        
+        # One C-level scan over the buffer for pipe-format lines
+        matches = list(self._LOG_RE.finditer(data))
+        pipe_df = pd.DataFrame([m.groups() for m in matches], columns=self._LOG_FIELDS)
+        # Only the matched groups are decoded
+        for col in self._LOG_FIELDS:
+            pipe_df[col] = pipe_df[col].str.decode('utf-8')
+        pipe_df['_line_key'] = [self._line_key(base_offset + m.start(), m.group()) for m in matches]
+        pipe_df['timestamp'] = pd.to_datetime(
+            pipe_df['timestamp'], format='%Y-%m-%d %H:%M:%S.%f', errors='coerce'
         )
         
-        match = re.match(pattern, line)
-        if match:
-            data = match.groupdict()
-            # Convert timestamp to datetime object
-            data['timestamp'] = datetime.strptime(
-                data['timestamp'], 
-                '%Y-%m-%d %H:%M:%S.%f'
+        frames = [frame for frame in (json_df, pipe_df) if not frame.empty]
+        df = pd.concat(frames, ignore_index=True) if frames else json_df
+        
+        response_time = pd.to_numeric(df['response_time'], errors='coerce')
+        # Only whole numbers that fit in int64 are kept; anything else counts as unparseable
+        df['response_time'] = response_time.where(
+            (response_time % 1 == 0) & (response_time.abs() < 2**63)
+        )
+        # JSON lines can omit, null out or mistype fields the pipe regex always enforces
+        df = df.dropna(subset=self._LOG_FIELDS)
+        
+        skipped = len(self._NONBLANK_LINE_RE.findall(data)) - len(df)
+        if skipped > 0:
+            print(f"Skipping {skipped} unparseable log lines")
+        
+        if df.empty:
+            return df
+        
+        df = df.copy()
+        df['response_time'] = df['response_time'].astype('int64')
+        # Deterministic _id (timestamp seconds + line digest): re-reading a batch after a
+        # partial failure hits duplicate keys instead of storing the same log twice
+        seconds = (df['timestamp'] - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+        df['_id'] = [
+            ObjectId((sec % 2**32).to_bytes(4, 'big') + key)
+            for sec, key in zip(seconds.tolist(), df.pop('_line_key'))
+        ]
+        df['ingestion_time'] = datetime.now()
+        return df
+    
+    def insert_logs(self, records):
+        """Bulk insert parsed records in unordered chunks"""
+        for start in range(0, len(records), self.INSERT_CHUNK_SIZE):
+            try:
+                self.collection.insert_many(
+                    records[start:start + self.INSERT_CHUNK_SIZE],
+                    ordered=False,
+                    bypass_document_validation=True
+                )
+            except BulkWriteError as e:
+                # Duplicate keys are lines already stored by an earlier, partly failed attempt
+                other_errors = [
+                    err for err in e.details.get('writeErrors', [])
+                    if err.get('code') != 11000
+                ]
+                if other_errors or e.details.get('writeConcernErrors'):
+                    raise
+    
+    @staticmethod
+    def _file_identity(fh):
+        """Identify an open log file by device/inode and a digest of its first line"""
+        stat = os.fstat(fh.fileno())
+        position = fh.tell()
+        fh.seek(0)
+        first_line = fh.readline()
+        fh.seek(position)
+        return {
+            'device': stat.st_dev,
+            'inode': stat.st_ino,
+            'head': hashlib.blake2b(first_line, digest_size=8).hexdigest()
+        }
+    
+    def _load_position(self):
+        """Read the saved file offset and identity, or (0, None) if there are none"""
+        try:
+            with open(self.offset_file_path, 'r') as f:
+                saved = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return 0, None
+        
+        # Plain offsets were saved before the file identity was recorded
+        if isinstance(saved, int):
+            return saved, None
+        return int(saved.get('position', 0)), saved.get('identity')
+    
+    def _save_position(self):
+        """Atomically persist the current file offset and the identity of the file it refers to"""
+        if self._identity is None:
+            # Only computed once a full first line has been read
+            self._identity = self._file_identity(self._fh)
+        
+        tmp_path = self.offset_file_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'position': self.last_position, 'identity': self._identity}, f)
+        os.replace(tmp_path, self.offset_file_path)
+    
+    def reopen_log_file(self):
+        """Drop the cached handle so the next read starts the (new) file from the top"""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        self.last_position = 0
+        self._saved_identity = None
+        self._identity = None
+    
+    def _open_log_file(self):
+        """Open the log file once and keep the handle across ingest calls"""
+        # Shrunk below our position: truncated in place while we were running
+        if self._fh is not None and os.fstat(self._fh.fileno()).st_size < self.last_position:
+            self.reopen_log_file()
+        if self._fh is None:
+            self._fh = open(self.log_file_path, 'rb')
+            # The saved offset only applies to the file it was taken from: reset if the
+            # file was rotated/replaced (identity differs) or truncated (offset past EOF)
+            replaced = (
+                self._saved_identity is not None
+                and self._saved_identity != self._file_identity(self._fh)
             )
-            data['response_time'] = int(data['response_time'])
-            data['ingestion_time'] = datetime.now()
-            return data
-        return None
+            if replaced or self.last_position > os.fstat(self._fh.fileno()).st_size:
+                self.last_position = 0
+            self._saved_identity = None
+            self._fh.seek(self.last_position)
+        return self._fh
     
     def ingest_logs(self):
-        """Read and ingest logs from file"""
+        """Read and ingest logs appended since the last call"""
         try:
-            with open(self.log_file_path, 'r', encoding='utf-8') as f:
-                # Seek to last read position
-                f.seek(self.last_position)
-                
-                lines = f.readlines()
-                if lines:
-                    parsed_logs = []
-                    for line in lines:
-                        line = line.strip()
-                        if line:
-                            parsed_log = self.parse_log_line(line)
-                            if parsed_log:
-                                parsed_logs.append(parsed_log)
-                    
-                    if parsed_logs:
-                        self.collection.insert_many(parsed_logs)
-                        print(f"Ingested {len(parsed_logs)} log entries")
-                
-                # Update position
-                self.last_position = f.tell()
+            f = self._open_log_file()
+            data = f.read()
+            # Leave a partially written last line for the next event
+            complete = data.rfind(b'\n') + 1
+            if complete < len(data):
+                f.seek(self.last_position + complete)
+                data = data[:complete]
+            
+            if data:
+                df = self.parse_log_batch(data, base_offset=self.last_position)
+                if not df.empty:
+                    self.insert_logs(df.to_dict('records'))
+                    print(f"Ingested {len(df)} log entries")
+            
+            # Update position only once the batch is stored
+            position = self.last_position + complete
+            if position != self.last_position:
+                self.last_position = position
+                self._save_position()
                 
         except FileNotFoundError:
             print(f"Log file not found: {self.log_file_path}")
         except Exception as e:
             print(f"Error ingesting logs: {e}")
+            # Rewind so the failed batch is read again on the next event
+            if self._fh is not None:
+                self._fh.seek(self.last_position)
     
-    def start_continuous_ingestion(self, interval=5):
-        """Continuously ingest logs at specified interval"""
+    def start_continuous_ingestion(self):
+        """Ingest new log lines as soon as the file is modified"""
         print(f"Starting log ingestion from {self.log_file_path}")
         print(f"Storing in MongoDB: {self.config['mongodb']['database']}")
         print("Press Ctrl+C to stop\n")
         
+        # Pick up anything written before we started watching
+        self.ingest_logs()
+        
+        observer = Observer()
+        observer.schedule(
+            LogFileHandler(self),
+            os.path.dirname(os.path.abspath(self.log_file_path)),
+            recursive=False
+        )
+        observer.start()
+        
         try:
-            while True:
-                self.ingest_logs()
-                time.sleep(interval)
+            while observer.is_alive():
+                observer.join(timeout=1)
         except KeyboardInterrupt:
             print("\nLog ingestion stopped.")
+        finally:
+            observer.stop()
+            observer.join()
+            if self._fh is not None:
+                self._fh.close()
             self.client.close()
 
+
+class LogFileHandler(FileSystemEventHandler):
+    """Watchdog handler that triggers ingestion when the log file changes"""
+    
+    def __init__(self, ingestion):
+        self.ingestion = ingestion
+        self.log_file_path = os.path.abspath(ingestion.log_file_path)
+    
+    def _is_log_file(self, event):
+        return not event.is_directory and os.path.abspath(event.src_path) == self.log_file_path
+    
+    def on_created(self, event):
+        if self._is_log_file(event):
+            # Deleted and recreated: the cached handle still points at the old file
+            self.ingestion.reopen_log_file()
+            self.ingestion.ingest_logs()
+    
+    def on_modified(self, event):
+        if self._is_log_file(event):
+            self.ingestion.ingest_logs()
+
 if __name__ == "__main__":
     # Load config
     with open('../config/config.json', 'r') as f:
         config = json.load(f)
     
     ingestion = LogIngestion(config)
-    ingestion.start_continuous_ingestion(interval=3)
\ No newline at end of file
+    ingestion.start_continuous_ingestion()
\ No newline at end of file
@@ -3,9 +3,25 @@ import os
 from datetime import datetime, timedelta
 from pymongo import MongoClient, errors
 import pandas as pd
+import pyarrow as pa
+from pymongoarrow.api import Schema, find_arrow_all
 from collections import Counter
 
 
+# Arrow schema for log documents; BSON is decoded straight into columnar buffers
+LOG_SCHEMA = Schema({
+    'timestamp': pa.timestamp('ms'),
+    'level': pa.string(),
+    'service': pa.string(),
+    'user_id': pa.string(),
+    'ip_address': pa.string(),
+    'response_time': pa.int64(),
+    'message': pa.string()
+})
+
+INT16_MIN, INT16_MAX = -32_768, 32_767
+
+
 class LogProcessor:
     """A class for processing and analyzing log data stored in MongoDB."""
 
@@ -39,27 +55,33 @@ class LogProcessor:
         start_time = datetime.now() - timedelta(hours=hours)
 
         try:
-            logs = list(self.collection.find(
+            # Cursor batches stream straight into one Arrow table, no per-document dicts
+            table = find_arrow_all(
+                self.collection,
                 {'timestamp': {'$gte': start_time}},
-                {'_id': 0}
-            ))
+                schema=LOG_SCHEMA,
+                batch_size=10_000
+            )
+            df = table.to_pandas(types_mapper=pd.ArrowDtype)
         except Exception as e:
             print(f"⚠️ Error retrieving logs: {e}")
             return pd.DataFrame()
 
-        if logs:
-            df = pd.DataFrame(logs)
-            if 'timestamp' in df.columns:
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
-            return df
-
-        return pd.DataFrame()
+        # Low-cardinality columns: value_counts/isin/groupby run on integer codes
+        for col in ['level', 'service']:
+            df[col] = df[col].astype('category')
+        # Downcast only when every value fits; otherwise keep int64
+        rt_min, rt_max = df['response_time'].min(), df['response_time'].max()
+        if pd.notna(rt_min) and INT16_MIN <= rt_min and rt_max <= INT16_MAX:
+            df['response_time'] = df['response_time'].astype(pd.ArrowDtype(pa.int16()))
+        return df
 
     # ------------------- ANALYTICS FUNCTIONS -------------------
 
-    def calculate_statistics(self):
+    def calculate_statistics(self, df=None):
         """Calculate real-time log statistics for the past hour."""
-        df = self.get_logs_dataframe(hours=1)
+        if df is None:
+            df = self.get_logs_dataframe(hours=1)
 
         if df.empty:
             return None
@@ -71,8 +93,8 @@ class LogProcessor:
 
         stats = {
             'total_logs': len(df),
-            'log_levels': df['level'].value_counts().to_dict(),
-            'services': df['service'].value_counts().to_dict(),
+            'log_levels': df['level'].value_counts(sort=False).to_dict(),
+            'services': df['service'].value_counts(sort=False).to_dict(),
             'avg_response_time': df['response_time'].mean() if not df['response_time'].isnull().all() else None,
             'max_response_time': df['response_time'].max() if not df['response_time'].isnull().all() else None,
             'min_response_time': df['response_time'].min() if not df['response_time'].isnull().all() else None,
@@ -81,9 +103,10 @@ class LogProcessor:
         }
         return stats
 
-    def detect_anomalies(self):
+    def detect_anomalies(self, df=None):
         """Detect anomalies in log data such as high response time or high error rate."""
-        df = self.get_logs_dataframe(hours=1)
+        if df is None:
+            df = self.get_logs_dataframe(hours=1)
 
         if df.empty or len(df) < 10 or 'response_time' not in df.columns:
             return []
@@ -117,20 +140,36 @@ class LogProcessor:
 
         return anomalies
 
-    def get_peak_hours(self):
+    def get_peak_hours(self, df=None):
         """Identify peak usage hours in the last 24 hours."""
-        df = self.get_logs_dataframe(hours=24)
+        if df is None:
+            df = self.get_logs_dataframe(hours=24)
         if df.empty or 'timestamp' not in df.columns:
             return {}
 
-        df['hour'] = pd.to_datetime(df['timestamp']).dt.hour
-        hourly_counts = df['hour'].value_counts().sort_index()
+        hourly_counts = df['timestamp'].dt.hour.value_counts().sort_index()
 
         return hourly_counts.to_dict()
 
-    def get_frequent_errors(self, top_n=5):
+    def get_service_peak_hours(self, df=None):
+        """Identify peak usage hours per service in the last 24 hours."""
+        if df is None:
+            df = self.get_logs_dataframe(hours=24)
+        if df.empty or 'service' not in df.columns or 'timestamp' not in df.columns:
+            return {}
+
+        hour = df['timestamp'].dt.hour.rename('hour')
+        counts = df.groupby(['service', hour], observed=True).size()
+
+        service_hours = {}
+        for (service, hour), count in counts.items():
+            service_hours.setdefault(service, {})[hour] = int(count)
+        return service_hours
+
+    def get_frequent_errors(self, top_n=5, df=None):
         """Return the most frequent error messages from the past 24 hours."""
-        df = self.get_logs_dataframe(hours=24)
+        if df is None:
+            df = self.get_logs_dataframe(hours=24)
         if df.empty or 'level' not in df.columns or 'message' not in df.columns:
             return []
 
@@ -145,16 +184,22 @@ class LogProcessor:
 
     def generate_report(self):
         """Generate a comprehensive analytics report and save as JSON."""
-        stats = self.calculate_statistics()
-        anomalies = self.detect_anomalies()
-        peak_hours = self.get_peak_hours()
-        frequent_errors = self.get_frequent_errors()
+        # Fetch each window once and share it across the analytics below
+        hour_df = self.get_logs_dataframe(hours=1)
+        day_df = self.get_logs_dataframe(hours=24)
+
+        stats = self.calculate_statistics(hour_df)
+        anomalies = self.detect_anomalies(hour_df)
+        peak_hours = self.get_peak_hours(day_df)
+        service_peak_hours = self.get_service_peak_hours(day_df)
+        frequent_errors = self.get_frequent_errors(df=day_df)
 
         report = {
             'generated_at': datetime.now().isoformat(),
             'statistics': stats,
             'anomalies': anomalies,
             'peak_hours': peak_hours,
+            'service_peak_hours': service_peak_hours,
             'frequent_errors': frequent_errors
         }
 
@@ -1,3 +1,4 @@
+import io
 import time
 from hdfs import InsecureClient
 
@@ -23,29 +24,50 @@ if not client.status(HDFS_FILE, strict=False):
     client.write(HDFS_FILE, '', encoding='utf-8', overwrite=True)
     print(f"✅ Created empty HDFS file: {HDFS_FILE}")
 
-# Track file position
-last_position = 0
+# Upload batching: appends go out once enough bytes are buffered or the
+# oldest buffered line has waited long enough
+FLUSH_BYTES = 64 * 1024
+FLUSH_INTERVAL = 30  # seconds
+
+buffer = io.StringIO()
+buffered_lines = 0
+buffer_started = None
+
+# Local file handle is kept open so the read position carries over
+local_file = None
 
 while True:
     try:
-        with open(LOCAL_LOG_PATH, 'r', encoding='utf-8') as f:
-            # Move to last read position
-            f.seek(last_position)
-            # Read new lines
-            new_lines = f.readlines()
-            # Update file position
-            last_position = f.tell()
-
-            if new_lines:
-                # Append new lines to HDFS file
-                client.write(HDFS_FILE, ''.join(new_lines), encoding='utf-8', append=True)
-                print(f"✅ Uploaded {len(new_lines)} new lines to HDFS")
-            else:
-                print("ℹ️ No new lines to upload")
+        if local_file is None:
+            local_file = open(LOCAL_LOG_PATH, 'r', encoding='utf-8')
+
+        # Read new lines since the last poll
+        new_lines = local_file.readlines()
+        if new_lines:
+            if buffer_started is None:
+                buffer_started = time.time()
+            buffer.writelines(new_lines)
+            buffered_lines += len(new_lines)
+
+        if buffered_lines and (
+            buffer.tell() >= FLUSH_BYTES
+            or time.time() - buffer_started >= FLUSH_INTERVAL
+        ):
+            # Append the whole batch to HDFS in one request
+            client.write(HDFS_FILE, buffer.getvalue(), encoding='utf-8', append=True)
+            print(f"✅ Uploaded {buffered_lines} new lines to HDFS")
+            buffer = io.StringIO()
+            buffered_lines = 0
+            buffer_started = None
+        elif new_lines:
+            print(f"ℹ️ Buffered {buffered_lines} lines for upload")
+        elif not buffered_lines:
+            print("ℹ️ No new lines to upload")
 
     except FileNotFoundError:
         print(f"❌ Local log file not found: {LOCAL_LOG_PATH}")
     except Exception as e:
+        # Buffer is kept, so the batch is retried on the next poll
         print(f"❌ Upload failed: {e}")
 
     time.sleep(5)  # Check for new logs every 5 seconds